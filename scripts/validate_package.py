@@ -10,78 +10,114 @@ pipeline.
 """
 
 import argparse
-import ast
-import importlib.util
+import collections
+import functools
+import hashlib
+import os
 import re
 import sys
 from pathlib import Path
 
-import semver
-import yaml
-
 METADATA_FILENAME = "rayforge-package.yaml"
+CACHE_FILENAME = ".rayforge-validate-cache.json"
+
+# The expected type of a schema key and whether it is required.
+Rule = collections.namedtuple("Rule", "type required", defaults=(False,))
 
 # Schema defines required keys and their expected types.
 SCHEMA = {
-    "name": {"type": str, "required": True},
-    "description": {"type": str, "required": True},
-    "author": {"type": dict, "required": True},
-    "provides": {"type": dict, "required": True},
+    "name": Rule(str, required=True),
+    "description": Rule(str, required=True),
+    "author": Rule(dict, required=True),
+    "provides": Rule(dict, required=True),
 }
 
 AUTHOR_SCHEMA = {
-    "name": {"type": str, "required": True},
-    "email": {"type": str, "required": True},
+    "name": Rule(str, required=True),
+    "email": Rule(str, required=True),
 }
 
+# Below this many asset directories, a thread pool costs more than it saves.
+_PARALLEL_LISTING_THRESHOLD = 8
 
-def _check_non_empty_str(value, key_name):
-    """Raises ValueError if a string is None, empty, or just whitespace."""
-    if not value or not value.strip():
-        raise ValueError(f"Key '{key_name}' must not be empty.")
+# The official SemVer 2.0.0 regex, see https://semver.org.
+_SEMVER_RE = re.compile(
+    r"(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)"
+    r"(?:-(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)"
+    r"(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*)?"
+    r"(?:\+[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*)?"
+)
 
+# Basic email regex to catch common mistakes.
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
 
-def _validate_dict_schema(data, schema, parent_key=""):
-    """Recursively validates a dictionary against a defined schema."""
-    for key, rules in schema.items():
-        full_key = f"{parent_key}.{key}" if parent_key else key
-        if rules.get("required") and key not in data:
-            raise ValueError(f"Missing required key: '{full_key}'")
 
-        if key in data:
-            expected_type = rules["type"]
-            actual_value = data[key]
-            if not isinstance(actual_value, expected_type):
-                raise TypeError(
-                    f"Key '{full_key}' has wrong type. "
-                    f"Expected {expected_type.__name__}, but "
-                    f"got {type(actual_value).__name__}."
-                )
+class MetadataParseError(Exception):
+    """Raised when the metadata file is not valid YAML."""
 
 
-def validate_schema(data):
-    """Checks for required keys and correct types in the metadata."""
-    print("-> Running schema validation...")
-    _validate_dict_schema(data, SCHEMA)
-    _validate_dict_schema(data.get("author", {}), AUTHOR_SCHEMA, "author")
-    print("   ... Schema OK")
+def _check_non_empty_str(value, key_name):
+    """Raises ValueError if a string is None, empty, or just whitespace."""
+    if not value or not value.strip():
+        raise ValueError(f"Key '{key_name}' must not be empty.")
 
 
-def _check_tag(tag):
+def _compile_schema(schema, parent_key=""):
+    """
+    Generates a validator function specialized for a schema.
+
+    The schema is unrolled into straight-line presence and type checks
+    once, so validating a dictionary does not interpret the schema again.
+    """
+    lines = ["def validate(data):"]
+    namespace = {}
+    for i, (key, rule) in enumerate(schema.items()):
+        full_key = f"{parent_key}.{key}" if parent_key else key
+        expected_type = rule.type
+        namespace[f"_type{i}"] = expected_type
+        namespace[f"_missing{i}"] = f"Missing required key: '{full_key}'"
+        namespace[f"_wrong_type{i}"] = (
+            f"Key '{full_key}' has wrong type. "
+            f"Expected {expected_type.__name__}, but got "
+        )
+        lines += [
+            f"    if {key!r} in data:",
+            f"        value = data[{key!r}]",
+            f"        if not isinstance(value, _type{i}):",
+            "            raise TypeError(",
+            f"                _wrong_type{i} + type(value).__name__ + '.'",
+            "            )",
+        ]
+        if rule.required:
+            lines += [
+                "    else:",
+                f"        raise ValueError(_missing{i})",
+            ]
+    lines.append("    return data")
+
+    source = "\n".join(lines) + "\n"
+    code = compile(source, f"<schema {parent_key or 'root'}>", "exec")
+    exec(code, namespace)
+    return namespace["validate"]
+
+
+_validate_top = _compile_schema(SCHEMA)
+_validate_author = _compile_schema(AUTHOR_SCHEMA, "author")
+
+
+def _check_tag(tag, log):
     """Validates that a tag is a valid semantic version."""
     if not tag:
         return
-    try:
-        semver.VersionInfo.parse(tag.lstrip("v"))
-        print(f"   ... Version tag '{tag}' OK")
-    except ValueError:
+    if not _SEMVER_RE.fullmatch(tag.lstrip("v")):
         raise ValueError(
             f"Version tag '{tag}' is not a valid semantic version "
             "(e.g., v1.2.3)."
         )
+    log.append(f"   ... Version tag '{tag}' OK")
 
 
-def _check_package_name(metadata_name, expected_name):
+def _check_package_name(metadata_name, expected_name, log):
     """Validates package name in metadata against the expected one."""
     if not expected_name:
         return
@@ -90,90 +126,182 @@ def _check_package_name(metadata_name, expected_name):
             f"Package name mismatch. Expected '{expected_name}', but "
             f"metadata has '{metadata_name}'."
         )
-    print(f"   ... Package name '{expected_name}' OK")
+    log.append(f"   ... Package name '{expected_name}' OK")
 
 
 def _check_author_content(author_data):
     """Checks for placeholders and valid content in the author field."""
-    name = author_data.get("name", "")
-    email = author_data.get("email", "")
+    name = author_data.get("name") or ""
+    email = author_data.get("email") or ""
 
-    _check_non_empty_str(name, "author.name")
-    _check_non_empty_str(email, "author.email")
+    if not name.strip():
+        raise ValueError("Key 'author.name' must not be empty.")
+    if not email.strip():
+        raise ValueError("Key 'author.email' must not be empty.")
 
     if "your-github-username" in name:
         raise ValueError(
             "Placeholder 'author.name' detected. Please update it."
         )
 
-    # Basic email regex to catch common mistakes.
-    email_regex = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-    if not re.match(email_regex, email):
+    if not _EMAIL_RE.match(email):
         raise ValueError(f"Author email '{email}' has an invalid format.")
 
 
 def _check_asset_path(path_str, root_path):
-    """Validates an asset path for existence and security."""
+    """Validates an asset path for security and returns its location."""
     if not path_str or not isinstance(path_str, str):
         raise ValueError("Asset entry is missing a valid 'path' key.")
 
-    if ".." in Path(path_str).parts:
+    # A trailing separator is allowed, e.g. for directories. Drive paths
+    # like 'C:x' or 'C:/x' would discard the package root on Windows.
+    parts = path_str.replace("\\", "/").split("/")
+    if (
+        parts[0] == ""
+        or (len(parts[0]) >= 2 and parts[0][1] == ":")
+        or ".." in parts
+        or "" in parts[1:-1]
+    ):
         raise ValueError(
-            f"Invalid asset path: '{path_str}'. Paths must not use '..'."
+            f"Invalid asset path: '{path_str}'. Paths must be relative "
+            "and must not use '..' or empty segments."
         )
 
-    asset_path = root_path / path_str
-    if not asset_path.exists():
-        raise FileNotFoundError(f"Asset path '{path_str}' does not exist.")
+    return root_path / path_str
+
+
+def _list_dir(directory):
+    """
+    Returns the entries of a directory by name.
+
+    A missing directory has no entries; other errors are raised.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
 
 
-def _check_code_entry_point(entry_point, root_path):
+def _asset_exists(path, entry):
+    """
+    Returns True if an asset exists, following symlinks.
+
+    entry is the asset's DirEntry from its parent's listing, or None. A
+    name missing from the listing is still looked up, as it may differ
+    only in case or Unicode normalization on some filesystems.
+    """
+    if entry is not None and not entry.is_symlink():
+        return True
+    try:
+        if entry is not None:
+            entry.stat()
+        else:
+            os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    return True
+
+
+def _check_assets_exist(asset_paths):
+    """
+    Checks that all (path_str, asset_path) pairs exist on disk.
+
+    Each parent directory is listed only once, no matter how many assets
+    it contains. Many directories are listed concurrently.
+    """
+    parents = list(dict.fromkeys(path.parent for _, path in asset_paths))
+    if len(parents) >= _PARALLEL_LISTING_THRESHOLD:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(32, len(parents))) as pool:
+            listings = dict(zip(parents, pool.map(_list_dir, parents)))
+    else:
+        listings = {parent: _list_dir(parent) for parent in parents}
+    for path_str, path in asset_paths:
+        if not _asset_exists(path, listings[path.parent].get(path.name)):
+            raise FileNotFoundError(
+                f"Asset path '{path_str}' does not exist."
+            )
+
+
+@functools.lru_cache(maxsize=256)
+def _top_level_names(module_path, mtime_ns):
+    """
+    Returns the names defined at the top level of a Python module.
+
+    The modification time is part of the cache key so that edited modules
+    are parsed again.
+    """
+    import ast
+
+    source = module_path.read_text()
+    tree = ast.parse(source, filename=module_path.name)
+
+    names = set()
+    for node in tree.body:
+        # Collect 'def name(...)', 'async def name(...)', 'class name(...)'
+        if isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        ):
+            names.add(node.name)
+        # Collect 'name = ...'
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names.add(target.id)
+        # Collect 'name: type = ...'; a bare annotation defines nothing.
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            if isinstance(node.target, ast.Name):
+                names.add(node.target.id)
+    return frozenset(names)
+
+
+def _resolve_module(module_name, root_path):
+    """
+    Returns the source file of a module inside the package root.
+
+    The module is resolved without going through the import system,
+    which could execute package code.
+    """
+    candidate = root_path.joinpath(*module_name.split("."))
+    for module_path in (
+        candidate.with_suffix(".py"),
+        candidate / "__init__.py",
+    ):
+        if module_path.is_file():
+            return module_path
+    raise FileNotFoundError(f"Module '{module_name}' not found.")
+
+
+def _check_code_entry_point(entry_point, root_path, log):
     """
     Validates a Python entry point without executing code.
 
     Checks that the module exists and the specified attribute is defined
     within it using static analysis (AST).
     """
-    if ":" not in entry_point:
+    module_name, _, attr_name = entry_point.partition(":")
+    # Only dotted identifiers are importable, and they keep the lookup
+    # inside the package root.
+    if not attr_name or not all(
+        part.isidentifier() for part in module_name.split(".")
+    ):
         raise ValueError(
             f"Code entry point '{entry_point}' is invalid. "
             "Expected format 'path.to.module:function_name'."
         )
 
-    module_name, attr_name = entry_point.split(":", 1)
-
-    # Temporarily add package root to path to allow finding the module
-    sys.path.insert(0, str(root_path))
-    try:
-        spec = importlib.util.find_spec(module_name)
-        if spec is None or spec.origin is None:
-            raise FileNotFoundError(f"Module '{module_name}' not found.")
-
-        module_path = Path(spec.origin)
-        source = module_path.read_text()
-        tree = ast.parse(source, filename=module_path.name)
-
-        for node in tree.body:
-            # Check for 'def attr_name(...)' or 'class attr_name(...)'
-            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
-                if node.name == attr_name:
-                    print(f"   ... Code entry point '{entry_point}' OK")
-                    return
-            # Check for 'attr_name = ...'
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name) and target.id == attr_name:
-                        print(f"   ... Code entry point '{entry_point}' OK")
-                        return
-
+    module_path = _resolve_module(module_name, root_path)
+    mtime_ns = module_path.stat().st_mtime_ns
+    if attr_name not in _top_level_names(module_path, mtime_ns):
         raise NameError(
             f"Attribute '{attr_name}' not found in module '{module_name}'."
         )
-    finally:
-        sys.path.pop(0)
+    log.append(f"   ... Code entry point '{entry_point}' OK")
 
 
-def _check_provides(provides_data, root_path):
+def _check_provides(provides_data, root_path, log):
     """Validates the content of the 'provides' section."""
     if not provides_data or not (
         "code" in provides_data or "assets" in provides_data
@@ -186,40 +314,202 @@ def _check_provides(provides_data, root_path):
         assets = provides_data["assets"]
         if not isinstance(assets, list):
             raise TypeError("'provides.assets' must be a list.")
+        asset_paths = []
         for asset_info in assets:
             if not isinstance(asset_info, dict):
                 raise TypeError("Each entry in 'assets' must be a dictionary.")
-            _check_asset_path(asset_info.get("path"), root_path)
+            path_str = asset_info.get("path")
+            asset_paths.append(
+                (path_str, _check_asset_path(path_str, root_path))
+            )
+        _check_assets_exist(asset_paths)
 
     if "code" in provides_data:
-        _check_code_entry_point(provides_data["code"], root_path)
+        _check_code_entry_point(provides_data["code"], root_path, log)
+
+
+def validate(data, root_path, log, tag=None, name=None):
+    """
+    Validates the metadata schema and content in a single pass.
 
+    Presence and types are checked by the validators generated from the
+    schemas, followed by the content checks in a fixed key order. Progress
+    messages are appended to log.
+    """
+    log.append("-> Running validation...")
+    _check_tag(tag, log)
 
-def validate_content(data, root_path, tag=None, name=None):
-    """Performs sanity checks on the metadata content."""
-    print("-> Running content validation...")
-    _check_tag(tag)
-    _check_package_name(data.get("name"), name)
+    _validate_top(data)
+    _check_package_name(data["name"], name, log)
+    _check_non_empty_str(data["name"], "name")
+    _check_non_empty_str(data["description"], "description")
 
-    _check_non_empty_str(data.get("name"), "name")
-    _check_non_empty_str(data.get("description"), "description")
+    _check_author_content(_validate_author(data["author"]))
+    _check_provides(data["provides"], root_path, log)
+    log.append("   ... Metadata OK")
 
-    _check_author_content(data.get("author", {}))
-    _check_provides(data.get("provides", {}), root_path)
-    print("   ... Content OK")
 
+def _load_metadata(raw):
+    """Parses the raw bytes of the YAML metadata file."""
+    import yaml
 
-def _load_metadata(metadata_file):
-    """Loads and parses the YAML metadata file."""
-    if not metadata_file.is_file():
+    # Prefer the libyaml-backed loader; fall back to the pure-Python one.
+    loader = getattr(yaml, "CSafeLoader", None)
+    if loader is None:
         print(
-            f"\nERROR: Metadata file not found at '{metadata_file}'",
+            "WARNING: libyaml is not available, falling back to the slower "
+            "pure-Python YAML loader.",
             file=sys.stderr,
         )
-        sys.exit(1)
+        loader = yaml.SafeLoader
 
-    with open(metadata_file, "r") as f:
-        return yaml.safe_load(f)
+    try:
+        return yaml.load(raw, Loader=loader)
+    except yaml.YAMLError as e:
+        raise MetadataParseError(str(e)) from e
+
+
+def _cache_key(raw, tag=None, name=None):
+    """
+    Returns a digest identifying a validation run.
+
+    The digest covers the metadata file content and the arguments that
+    influence the result, so a changed tag or name is never a cache hit.
+    """
+    digest = hashlib.sha256(raw)
+    digest.update(f"\0{tag or ''}\0{name or ''}".encode())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _validator_version():
+    """Returns a digest of this script, so editing it invalidates caches."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def _dependencies(metadata, root_path):
+    """
+    Returns the files besides the metadata that validation looked at.
+
+    Paths are relative to the package root, so a cache entry stays
+    meaningful when the package is moved or copied.
+    """
+    provides = metadata["provides"]
+    paths = [
+        root_path / asset_info["path"]
+        for asset_info in provides.get("assets", [])
+    ]
+    if "code" in provides:
+        module_name = provides["code"].split(":", 1)[0]
+        paths.append(_resolve_module(module_name, root_path))
+    return [os.path.relpath(path, root_path) for path in paths]
+
+
+def _stat_files(root_path, paths):
+    """Returns the mtime and size of each path, or None if it is missing."""
+    stats = {}
+    for path in paths:
+        try:
+            stat = os.stat(root_path / path)
+        except OSError:
+            stats[path] = None
+        else:
+            stats[path] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def _is_fresh(entry, root_path):
+    """
+    Returns True if a cache entry is still valid for the package.
+
+    The entry must come from this exact version of the script, and none
+    of the files the validation depended on may have changed since.
+    """
+    if not isinstance(entry, dict):
+        return False
+    if entry.get("validator") != _validator_version():
+        return False
+    files = entry.get("files")
+    return isinstance(files, dict) and _stat_files(root_path, files) == files
+
+
+def _stat_key(metadata_file):
+    """Returns a cache key derived from the file's mtime and size only."""
+    stat = metadata_file.stat()
+    return f"stat:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _load_cache(cache_file):
+    """Loads the validation cache, returning an empty one if unusable."""
+    # Prefer orjson; fall back to the standard library.
+    try:
+        from orjson import loads
+    except ImportError:
+        from json import loads
+
+    try:
+        cache = loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(cache_file, cache):
+    """Writes the validation cache. Failures are silently ignored."""
+    try:
+        import orjson
+
+        data = orjson.dumps(cache)
+    except ImportError:
+        import json
+
+        data = json.dumps(cache).encode()
+
+    try:
+        cache_file.write_bytes(data)
+    except OSError:
+        pass
+
+
+def _run_validation(root_path, args, log):
+    """
+    Validates the package at root_path, consulting the validation cache.
+
+    Returns normally on success and raises on any validation failure.
+    """
+    metadata_file = root_path / METADATA_FILENAME
+    cache_file = root_path / CACHE_FILENAME
+    cache = {} if args.no_cache else _load_cache(cache_file)
+
+    # Without --tag and --name, an untouched file is not even read. The
+    # files it references are still checked for changes.
+    stat_key = None
+    if args.tag is None and args.name is None:
+        stat_key = _stat_key(metadata_file)
+        if _is_fresh(cache.get(stat_key), root_path):
+            log.append("   ... unchanged since last successful validation")
+            return
+
+    raw = metadata_file.read_bytes()
+    cache_key = _cache_key(raw, args.tag, args.name)
+    if _is_fresh(cache.get(cache_key), root_path):
+        log.append("   ... cached OK")
+        return
+
+    metadata = _load_metadata(raw)
+    if not isinstance(metadata, dict):
+        raise TypeError(f"'{METADATA_FILENAME}' must be a YAML dictionary.")
+
+    validate(metadata, root_path, log, tag=args.tag, name=args.name)
+
+    entry = {
+        "validator": _validator_version(),
+        "files": _stat_files(root_path, _dependencies(metadata, root_path)),
+    }
+    cache = {cache_key: entry}
+    if stat_key:
+        cache[stat_key] = entry
+    _save_cache(cache_file, cache)
 
 
 def main():
@@ -243,37 +533,40 @@ def main():
         default=None,
         help="The expected package name (used by CI, optional locally).",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run a full validation, ignoring cached results.",
+    )
     args = parser.parse_args()
 
     root_path = Path(args.path).resolve()
     metadata_file = root_path / METADATA_FILENAME
-    print(f"Validating package at: {root_path}")
-
-    try:
-        metadata = _load_metadata(metadata_file)
-        if not isinstance(metadata, dict):
-            raise TypeError(
-                f"'{METADATA_FILENAME}' must be a YAML dictionary."
-            )
 
-        validate_schema(metadata)
-        validate_content(metadata, root_path, tag=args.tag, name=args.name)
-
-        print("\nSUCCESS: Your package metadata looks great!")
-        return 0
-
-    except (ValueError, TypeError, FileNotFoundError, NameError) as e:
-        print(f"\nERROR: Validation failed. {e}", file=sys.stderr)
-        return 1
-    except yaml.YAMLError as e:
-        print(
-            f"\nERROR: Could not parse '{METADATA_FILENAME}'. {e}",
-            file=sys.stderr,
-        )
-        return 1
-    except Exception as e:
-        print(f"\nERROR: An unexpected error occurred. {e}", file=sys.stderr)
+    # Progress messages are collected and written to stdout in one go.
+    log = [f"Validating package at: {root_path}"]
+    error = None
+    if not metadata_file.is_file():
+        error = f"Metadata file not found at '{metadata_file}'"
+    else:
+        try:
+            _run_validation(root_path, args, log)
+        except (ValueError, TypeError, FileNotFoundError, NameError) as e:
+            error = f"Validation failed. {e}"
+        except MetadataParseError as e:
+            error = f"Could not parse '{METADATA_FILENAME}'. {e}"
+        except Exception as e:
+            error = f"An unexpected error occurred. {e}"
+
+    if error is None:
+        log.append("\nSUCCESS: Your package metadata looks great!")
+    sys.stdout.write("\n".join(log) + "\n")
+
+    if error is not None:
+        sys.stdout.flush()
+        print(f"\nERROR: {error}", file=sys.stderr)
         return 1
+    return 0
 
 
 if __name__ == "__main__":
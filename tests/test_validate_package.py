@@ -0,0 +1,55 @@
+"""Tests for scripts/validate_package.py, run through its command line."""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = REPO_ROOT / "scripts" / "validate_package.py"
+
+
+def _make_package(path):
+    """Creates a copy of the template package at path."""
+    path.mkdir()
+    shutil.copy2(REPO_ROOT / "rayforge-package.yaml", path)
+    shutil.copytree(REPO_ROOT / "my_package", path / "my_package")
+    shutil.copytree(REPO_ROOT / "assets", path / "assets")
+
+
+def _validate(path, *args):
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), str(path), *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_copied_package_reuses_cache(tmp_path):
+    original = tmp_path / "original"
+    _make_package(original)
+    assert _validate(original).returncode == 0
+
+    # copytree keeps mtimes, like 'cp -a', so the stat key still matches.
+    copy = tmp_path / "copy"
+    shutil.copytree(original, copy)
+
+    result = _validate(copy)
+    assert result.returncode == 0
+    assert "unchanged since last successful validation" in result.stdout
+
+
+def test_broken_copy_of_cached_package_fails(tmp_path):
+    original = tmp_path / "original"
+    _make_package(original)
+    assert _validate(original).returncode == 0
+
+    copy = tmp_path / "copy"
+    shutil.copytree(original, copy)
+    shutil.rmtree(copy / "assets" / "materials")
+    shutil.rmtree(copy / "my_package")
+
+    result = _validate(copy)
+    assert result.returncode == 1
+    assert "Asset path './assets/materials/' does not exist." in result.stderr
+    assert "SUCCESS" not in result.stdout